@@ -0,0 +1,77 @@
+"""
+Throughput/fairness tradeoff of the chain scheduling policies.
+
+Two chains run on the same event loop:
+
+* "busy" - a source, which never suspends, followed by several function steps;
+* "ticker" - a source, which wakes up every millisecond.
+
+For each policy we measure the throughput of the "busy" chain,
+and the lag of the "ticker" wakeups (how long it had to wait for the busy chain to give up control).
+
+Run as::
+
+    python benchmarks/bench_scheduling.py [-n ITEMS]
+"""
+import asyncio
+import argparse
+from time import perf_counter
+
+from snap.chain import Chain, wrap
+
+policies = {
+    'every=1 (old)':     dict(yield_every=1),
+    'every=10':          dict(yield_every=10),
+    'every=100':         dict(yield_every=100),
+    'interval=100us':    dict(yield_interval=1e-4),
+    'interval=1ms':      dict(yield_interval=1e-3),
+    'interval=10ms':     dict(yield_interval=1e-2),
+    'natural only':      dict(yield_interval=0),
+}
+
+def inc(d):
+    return d+1
+
+async def busy_source(n):
+    for i in range(n):
+        yield i
+
+async def ticker_source(lags, period=1e-3):
+    while True:
+        t0 = perf_counter()
+        await asyncio.sleep(period)
+        lags.append(perf_counter()-t0-period)
+        yield t0
+
+def percentile(data, q):
+    data = sorted(data)
+    return data[min(len(data)-1, int(q*len(data)))] if data else float('nan')
+
+async def run_policy(n_items, n_steps=5, **opts):
+    lags = []
+    busy = Chain('busy', busy_source(n_items), *[wrap(inc)]*n_steps, **opts)
+    ticker = Chain('ticker', ticker_source(lags), **opts)
+    t_ticker = asyncio.create_task(ticker.run())
+    await asyncio.sleep(0.01)
+    lags.clear()
+    t0 = perf_counter()
+    await busy.run()
+    dt = perf_counter()-t0
+    t_ticker.cancel()
+    await t_ticker
+    return {'items/s': n_items/dt,
+            'lag_p50_ms': percentile(lags,0.5)*1e3,
+            'lag_max_ms': max(lags, default=dt)*1e3,
+            'ticks': len(lags)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-n','--items', type=int, default=200000, help='number of items in the busy chain')
+    args = parser.parse_args()
+    print(f'{"policy":20s} {"items/s":>12s} {"lag p50,ms":>12s} {"lag max,ms":>12s} {"ticks":>6s}')
+    for name, opts in policies.items():
+        r = asyncio.run(run_policy(args.items, **opts))
+        print(f'{name:20s} {r["items/s"]:12.0f} {r["lag_p50_ms"]:12.3f} {r["lag_max_ms"]:12.3f} {r["ticks"]:6d}')
+
+if __name__=='__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Micro-batching of the data portions.
+
+A chain can group the incoming data portions into a :class:`Batch`,
+so that the following function steps are called once per batch instead of once per item.
+Steps marked as :func:`vectorized` receive the whole batch (as a list or a numpy array),
+the other function steps are applied to each item of the batch.
+"""
+import asyncio
+
+class Batch:
+    """A group of data portions, passed along the chain as a single item"""
+    __slots__ = ('items',)
+    def __init__(self, items):
+        self.items = items
+    def __len__(self):
+        return len(self.items)
+    def __iter__(self):
+        return iter(self.items)
+    def __repr__(self):
+        return f'Batch({self.items!r})'
+
+def vectorized(fun=None, *, stack:bool=False):
+    """Mark the function as a vectorized step: it will be called with the whole batch.
+
+    Can be used as ``@vectorized`` or ``@vectorized(stack=True)``.
+
+    Args:
+        stack
+            If True, the batch is passed as a numpy array (:code:`np.asarray(items)`),
+            otherwise as a list of items.
+    The function should return a sequence of results (not necessarily of the same length).
+    """
+    def _mark(f):
+        f.vectorized = 'stack' if stack else 'list'
+        return f
+    if fun is None:
+        return _mark
+    return _mark(fun)
+
+def is_vectorized(fun):
+    return getattr(fun, 'vectorized', None) is not None
+
+def is_batching(step):
+    """Check if the step produces :class:`Batch` objects"""
+    return getattr(step, 'batching', False)
+
+def batch_function(fun):
+    """Make a function of the batch items from the function *fun*"""
+    mode = getattr(fun, 'vectorized', None)
+    if mode=='stack':
+        import numpy as np
+        def _f(items):
+            return fun(np.asarray(items))
+    elif mode:
+        return fun
+    else:
+        def _f(items):
+            return [fun(d) for d in items]
+    _f.function = fun
+    return _f
+
+async def unbatch(source):
+    """Yield the items of each :class:`Batch` from the source one by one"""
+    async for b in source:
+        for d in b.items:
+            yield d
+
+async def collect(source, size:int, timeout:float|None=None):
+    """Group the items from the *source* into :class:`Batch` objects
+
+    Args:
+        source
+            async generator of the data portions
+        size
+            maximal number of items in a batch
+        timeout
+            maximal time (in seconds) to wait for the batch to be filled, after the first item has arrived.
+            If None - always wait for *size* items (or the end of the source).
+    """
+    if timeout is None:
+        items = []
+        async for d in source:
+            items.append(d)
+            if len(items)>=size:
+                yield Batch(items)
+                items = []
+        if items:
+            yield Batch(items)
+        return
+
+    #the source is read in a separate task, so that the batch can be sent on timeout
+    items = []
+    nonempty = asyncio.Event()
+    ready = asyncio.Event()
+    taken = asyncio.Event()
+    done = False
+    error = None
+
+    async def _produce():
+        nonlocal done, error
+        try:
+            async for d in source:
+                items.append(d)
+                if len(items)==1:
+                    nonempty.set()
+                if len(items)>=size:
+                    ready.set()
+                    taken.clear()
+                    await taken.wait()
+        except Exception as e:
+            error = e
+        finally:
+            done = True
+            nonempty.set()
+            ready.set()
+
+    task = asyncio.create_task(_produce())
+    try:
+        while True:
+            await nonempty.wait()
+            if not done:
+                try:
+                    await asyncio.wait_for(ready.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            batch, items = items, []
+            nonempty.clear()
+            ready.clear()
+            taken.set()
+            if batch:
+                yield Batch(batch)
+            if done and not items:
+                break
+        if error is not None:
+            raise error
+    finally:
+        task.cancel()
@@ -1,10 +1,12 @@
 import asyncio
 import inspect
+from time import perf_counter
 
 import logging
 from collections.abc import AsyncGenerator, Iterable
 from typing import Any, Optional, NewType
 from snap.elements.io import queue as q
+from snap import batch
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +14,45 @@ def _wrap_function(fun):
     async def _f(source):
         async for d in source:
             yield fun(d)
+    _f.function = fun
+    return _f
+
+def step_name(a)->str:
+    """A readable name of the step object, like "snap.elements.output.dump" """
+    a = getattr(a, 'function', a)
+    module = getattr(a, '__module__', None) or type(a).__module__
+    qualname = getattr(a, '__qualname__', None) or type(a).__qualname__
+    qualname = qualname.split('.<locals>',1)[0]
+    return f'{module}.{qualname}'
+
+def _fuse_functions(funcs):
+    """create a single async gen function, applying all the funcs consecutively"""
+    async def _f(source):
+        async for d in source:
+            try:
+                for fun in funcs:
+                    d = fun(d)
+            except Exception as e:
+                raise RuntimeError(f'Failed in step {step_name(fun)}') from e
+            yield d
+    _f.functions = funcs
+    _f.__qualname__ = '|'.join(step_name(f) for f in funcs)
+    return _f
+
+def _fuse_batch_functions(funcs):
+    """create a single async gen function, applying all the funcs consecutively to each batch"""
+    funcs = [batch.batch_function(f) for f in funcs]
+    async def _f(source):
+        async for b in source:
+            d = b.items
+            try:
+                for fun in funcs:
+                    d = fun(d)
+            except Exception as e:
+                raise RuntimeError(f'Failed in step {step_name(fun)}') from e
+            yield batch.Batch(d)
+    _f.functions = funcs
+    _f.__qualname__ = '|'.join(step_name(f) for f in funcs)
     return _f
 
 def _is_function(a):
@@ -36,7 +77,10 @@ def wrap(a):
 class Chain:
     def __init__(self, name:str,
                        source: AsyncGenerator|None = None,
-                       *elements: Iterable
+                       *elements: Iterable,
+                       fuse: bool = True,
+                       yield_every: int = 0,
+                       yield_interval: float = 1e-3
                        ):
         """Create chain of processing elements
         
@@ -49,6 +93,11 @@ class Chain:
             targets (iterable) - collection of buffer objects, where the results will be pushed.
                       If empty, the data output after the last element is lost
             name - the chain name, to provide  meaningful output
+            fuse (bool) - if True, consecutive function steps are combined in a single generator
+            yield_every (int) - if >0, give control to the other chains after every N output items
+            yield_interval (float) - if yield_every==0: give control to the other chains, 
+                      if the chain was running for more than this time (in seconds) without interruption.
+                      If both are 0, the chain relies only on the suspension points of its steps.
         """
         if source:
             self.source = source
@@ -56,34 +105,80 @@ class Chain:
             self.source = q.recv(name)
         self.elements = list(elements)
         self.name = name
+        self.fuse = fuse
+        self.yield_every = yield_every
+        self.yield_interval = yield_interval
+
+    def stages(self):
+        """Group the elements into stages: 
+        a list of consecutive functions (if self.fuse) or an async gen function"""
+        stages = []
+        for e in self.elements:
+            fun = getattr(e, 'function', None)
+            if fun is None:
+                stages.append(e)
+            elif self.fuse and stages and isinstance(stages[-1], list):
+                stages[-1].append(fun)
+            else:
+                stages.append([fun])
+        return stages
 
     def build(self):
         logger.info(f'Building chain: {self.name}')
         gen = self.source
-        for e in self.elements:
-            gen = e(gen)
+        batched = False
+        for s in self.stages():
+            if isinstance(s, list):
+                #function steps process the whole batch, other steps need separate items
+                s = _fuse_batch_functions(s) if batched else _fuse_functions(s)
+            elif batched:
+                gen = batch.unbatch(gen)
+                batched = False
+            gen = s(gen)
+            batched = batched or batch.is_batching(s)
+        if batched:
+            gen = batch.unbatch(gen)
         self.gen = gen
 
     async def run(self):
         self.build()
         logger.info(f'Starting chain: {self.name}')
         try:
-            async for d in self.gen:
-                await asyncio.sleep(0)
+            await self._iterate()
         except asyncio.CancelledError as e:
             logger.info(f'Stopping chain: {self.name}')
         except Exception as e:
-            raise RuntimeError(f'Failed run in chain {self.name}')
+            raise RuntimeError(f'Failed run in chain {self.name}') from e
 
-def make_chains(elements, source=None,  name="Chain"):
+    async def _iterate(self):
+        """Pull the data through the chain, yielding to the event loop according to the scheduling policy"""
+        if self.yield_every>0:
+            n = 0
+            async for d in self.gen:
+                n+=1
+                if n>=self.yield_every:
+                    n = 0
+                    await asyncio.sleep(0)
+        elif self.yield_interval>0:
+            t_next = perf_counter()+self.yield_interval
+            async for d in self.gen:
+                if perf_counter()>=t_next:
+                    await asyncio.sleep(0)
+                    t_next = perf_counter()+self.yield_interval
+        else:
+            async for d in self.gen:
+                pass
 
-    chain = Chain(name, source)
+def make_chains(elements, source=None,  name="Chain", **kwargs):
+    """Create the chains from the elements list, splitting it on the buffer objects.
+    Extra keyword arguments are passed to each :class:`Chain`"""
+    chain = Chain(name, source, **kwargs)
     chains = [chain]
     for e in elements:
         if _is_buffer(e):
             new_name = q.register(e,name=f'{name}.{e.__class__.__name__}')
             chain.elements.append(q.send([new_name]))
-            chain = Chain(name=new_name, source=q.recv(new_name))
+            chain = Chain(name=new_name, source=q.recv(new_name), **kwargs)
             chains.append(chain)
         else:
             chain.elements.append(wrap(e))
@@ -115,6 +115,9 @@ def construct_chain(loader, name, data):
     return ChainCfg(name, source, elements)
 
 def construct_from(loader, data):
+    if isinstance(data, yaml.MappingNode):
+        cfg = loader.construct_mapping(data, deep=True)
+        return {SourceCfg('.io.recv'):cfg}
     name = loader.construct_scalar(data)
     if '.' in name:
         return SourceCfg(name)
@@ -122,11 +125,17 @@ def construct_from(loader, data):
         return {SourceCfg('.io.recv'):{'address':name}}
 
 def construct_to(loader, data):
-    if isinstance(data, yaml.SequenceNode):
+    cfg = {}
+    if isinstance(data, yaml.MappingNode):
+        cfg = loader.construct_mapping(data, deep=True)
+        tgt = cfg.pop('address')
+        if isinstance(tgt, str):
+            tgt = [tgt]
+    elif isinstance(data, yaml.SequenceNode):
         tgt = loader.construct_sequence(data)
     else:
         tgt = [loader.construct_scalar(data)]
-    return {'.io.send':{'address': tgt}}
+    return {'.io.send':{'address': tgt, **cfg}}
 
 def construct_object(loader, name, data):
     name = name.split(':',1)[-1]
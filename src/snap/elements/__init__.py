@@ -1,4 +1,4 @@
 """
 Collection of useful modules which can be used as sources/steps
 """
-from . import io, source, misc, output, tqdm, timing
+from . import io, source, misc, output, tqdm, timing, batch
@@ -0,0 +1,32 @@
+"""
+Batching steps
+==============
+"""
+from snap import batch
+
+def collect(size:int, timeout:float|None=None):
+    """
+    A processing :term:`step`.
+    Group the incoming data portions into batches, to reduce the per-item overhead of the following steps.
+
+    All the following function steps (up to the next generator/buffer step or the end of the chain)
+    are called once per batch: steps marked with :func:`snap.batch.vectorized` get the whole batch,
+    other functions are applied to each item of the batch.
+    After that the batch is split back into separate data portions.
+
+    Args:
+        size(int)
+            Maximal number of data portions in one batch
+        timeout(float or None)
+            Maximal time (in seconds) to wait for the batch to be filled after the first data portion arrived.
+            If None - wait until *size* data portions are collected.
+    :Input:
+        data (anything)
+    :Output:
+        batch of the data portions
+    """
+    async def _f(source):
+        async for b in batch.collect(source, size, timeout):
+            yield b
+    _f.batching = True
+    return _f
@@ -30,9 +30,11 @@ def get_provider(address: str):
         else:
             raise RuntimeError(f'Unknown transport "{transport}" for {address}')
 
-def recv(address: str):
-    return get_provider(address).recv(address)
+def recv(address: str, **kwargs):
+    return get_provider(address).recv(address, **kwargs)
     
-def send(address: list[str]):
-    return get_provider(address[0]).send(address)
+def send(address: list[str], **kwargs):
+    if isinstance(address, str):
+        address = [address]
+    return get_provider(address[0]).send(address, **kwargs)
 
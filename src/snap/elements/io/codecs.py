@@ -0,0 +1,91 @@
+"""
+Serialization codecs for the ZeroMQ transport.
+
+Each codec converts a data portion into a list of message frames and back.
+
+* ``pickle`` - pickle protocol 5, with the large buffers (e.g. numpy arrays) sent as separate frames without copying.
+  Compatible with the single-frame messages of ``send_pyobj``.
+* ``msgpack`` - `msgpack <https://msgpack.org>`_ serialization, for the simple data (numbers, strings, lists, dicts).
+  Requires the ``msgpack`` package.
+* ``numpy`` - a numpy array, or a dict of numpy arrays and JSON-serializable values.
+  Arrays are sent as raw frames without copying.
+
+:Note: the numpy arrays, received with ``pickle`` or ``numpy`` codecs, are read-only views of the received message.
+"""
+import json
+import pickle
+
+class PickleCodec:
+    def encode(self, obj)->list:
+        buffers = []
+        header = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        return [header, *[b.raw() for b in buffers]]
+
+    def decode(self, frames:list):
+        return pickle.loads(frames[0], buffers=frames[1:])
+
+class MsgpackCodec:
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ImportError('Codec "msgpack" requires the msgpack package: pip install msgpack') from e
+        self.packer = msgpack.Packer(use_bin_type=True)
+        self.unpackb = msgpack.unpackb
+
+    def encode(self, obj)->list:
+        return [self.packer.pack(obj)]
+
+    def decode(self, frames:list):
+        return self.unpackb(frames[0], raw=False)
+
+class NumpyCodec:
+    def __init__(self):
+        import numpy as np
+        self.np = np
+        self.to_descr = np.lib.format.dtype_to_descr
+        self.from_descr = np.lib.format.descr_to_dtype
+
+    def _encode_array(self, a, frames):
+        a = self.np.ascontiguousarray(a)
+        frames.append(memoryview(a).cast('B'))
+        return [self.to_descr(a.dtype), a.shape]
+
+    def _decode_array(self, spec, frame):
+        descr, shape = spec
+        dtype = self.from_descr(descr if isinstance(descr, str) else [tuple(d) for d in descr])
+        return self.np.frombuffer(frame, dtype=dtype).reshape(shape)
+
+    def encode(self, obj)->list:
+        frames = []
+        if isinstance(obj, self.np.ndarray):
+            header = {'array': self._encode_array(obj, frames)}
+        elif isinstance(obj, dict):
+            arrays = {k:self._encode_array(v, frames) for k,v in obj.items() if isinstance(v, self.np.ndarray)}
+            values = {k:v for k,v in obj.items() if not isinstance(v, self.np.ndarray)}
+            header = {'arrays': arrays, 'values': values}
+        else:
+            raise TypeError(f'Codec "numpy" can send only numpy arrays or dicts, got {type(obj)}')
+        return [json.dumps(header).encode(), *frames]
+
+    def decode(self, frames:list):
+        header = json.loads(bytes(frames[0]))
+        if 'array' in header:
+            return self._decode_array(header['array'], frames[1])
+        obj = dict(header['values'])
+        for (key, spec),frame in zip(header['arrays'].items(), frames[1:]):
+            obj[key] = self._decode_array(spec, frame)
+        return obj
+
+codecs = {
+    'pickle': PickleCodec,
+    'msgpack': MsgpackCodec,
+    'numpy': NumpyCodec,
+}
+
+def get_codec(name:str):
+    """Create the codec object by its name"""
+    try:
+        return codecs[name]()
+    except KeyError:
+        raise ValueError(f'Unknown codec "{name}". Available codecs are: {list(codecs)}') from None
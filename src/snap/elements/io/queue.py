@@ -2,53 +2,169 @@ import asyncio
 from typing import Dict
 import logging
 
-__registry: Dict[str,asyncio.Queue] = dict()
+class Queue(asyncio.Queue):
+    """An asyncio.Queue with configurable capacity and overflow policy.
 
-def register(obj:object = asyncio.Queue(), name:str|None=None)->str:
+    Args:
+        maxsize
+            Maximal number of items in the queue. If 0 - the queue is unbounded.
+        policy
+            What to do, when a new item is put to the full queue:
+
+            * ``block`` - wait until there is a free slot (backpressure on the producer)
+            * ``drop_oldest`` - discard the oldest item in the queue
+            * ``drop_newest`` - discard the new item
+            * ``coalesce`` - replace the newest item in the queue with the new one
+
+    Attributes:
+        high_water
+            Maximal number of items, which were in the queue simultaneously
+        dropped
+            Number of items discarded due to the overflow
+    """
+    policies = ('block','drop_oldest','drop_newest','coalesce')
+
+    def __init__(self, maxsize:int=0, policy:str='block'):
+        super().__init__(maxsize)
+        self.policy = 'block'
+        self.high_water = 0
+        self.dropped = 0
+        self.configure(maxsize, policy)
+
+    def configure(self, maxsize:int|None=None, policy:str|None=None):
+        """Change the capacity and/or overflow policy of the queue"""
+        if policy is not None:
+            if policy not in self.policies:
+                raise ValueError(f'Unknown queue policy "{policy}". Available policies are: {self.policies}')
+            self.policy = policy
+        if maxsize is not None:
+            self._maxsize = maxsize
+
+    def _put(self, item):
+        super()._put(item)
+        if len(self._queue) > self.high_water:
+            self.high_water = len(self._queue)
+
+    def put_nowait(self, item):
+        if self.policy!='block' and self.full():
+            self.dropped+=1
+            if self.policy=='drop_newest':
+                return
+            elif self.policy=='coalesce':
+                self._queue[-1] = item
+                return
+            elif self.policy=='drop_oldest':
+                self.get_nowait()
+                self.task_done()
+        super().put_nowait(item)
+
+    async def put(self, item):
+        if self.policy=='block':
+            return await super().put(item)
+        return self.put_nowait(item)
+
+    def stats(self)->dict:
+        """Current state and counters of this queue"""
+        return {'size':self.qsize(), 'maxsize':self.maxsize, 'policy':self.policy,
+                'high_water':self.high_water, 'dropped':self.dropped}
+
+_registry: Dict[str,asyncio.Queue] = dict()
+
+def register(obj:object|None = None, name:str|None=None)->str:
     """Register a new object *obj* with preferred name.
     If the name is taken, use {name}.01, {name}.02 etc.
+    If *obj* is None, a new unbounded :class:`Queue` is created.
 
     Returns:
     -------
     name in registry
     """
+    if obj is None:
+        obj = Queue()
     name0 = name or obj.__class__.__name__
     name = name0
     n = 0
-    while name in __registry:
+    while name in _registry:
         n+=1
         name = f'{name0}.{n:02d}'
-    __registry[name] = obj
+    _registry[name] = obj
     return name
 
 def strip_name(name:str):
     _prefix = 'queue://'
     if name.startswith(_prefix):
-        name = name.lstrip(_prefix)
+        name = name[len(_prefix):]
     return name
 
-def recv(address:str):
-    name = strip_name(address)
-    if name not in __registry:
-        __registry[name] = asyncio.Queue()
+def get_queue(name:str, maxsize:int|None=None, policy:str|None=None):
+    """Get the queue with given name from registry, or create a new one.
+    If *maxsize* or *policy* are given, the queue is reconfigured accordingly.
+    """
+    name = strip_name(name)
+    if name not in _registry:
+        _registry[name] = Queue()
+    q = _registry[name]
+    if maxsize is not None or policy is not None:
+        if isinstance(q, Queue):
+            q.configure(maxsize, policy)
+        else:
+            logging.warning(f'Object "{name}" of type {type(q)} is not configurable, ignoring maxsize={maxsize}, policy={policy}')
+    return q
+
+def recv(address:str, maxsize:int|None=None, policy:str|None=None):
+    """
+    Data :term:`source`.
+    Read data from the queue with given name.
 
-    q = __registry[name]
+    Args:
+        address
+            queue name, optionally with ``queue://`` prefix
+        maxsize
+            Maximal number of items in the queue (0 - unbounded)
+        policy
+            Overflow policy: ``block``, ``drop_oldest``, ``drop_newest`` or ``coalesce``
+    """
+    name = strip_name(address)
+    q = get_queue(name, maxsize, policy)
     logging.info(f'Reading queue "{name}"')
     async def _recv():
         while True:
             yield await q.get()
     return _recv()
 
-def send(address:list[str]):
+def send(address:list[str], maxsize:int|None=None, policy:str|None=None):
+    """
+    Processing :term:`step`.
+    Put the data to the queues with given names.
+
+    Args:
+        address
+            list of queue names, optionally with ``queue://`` prefix
+        maxsize
+            Maximal number of items in each of the target queues (0 - unbounded)
+        policy
+            Overflow policy of the target queues: ``block``, ``drop_oldest``, ``drop_newest`` or ``coalesce``
+    :Output:
+        data unchanged
+    """
+    if isinstance(address, str):
+        address=[address]
+    if maxsize is not None or policy is not None:
+        for a in address:
+            get_queue(a, maxsize, policy)
+
     async def _f(source):
         try:
-            targets = [__registry[strip_name(a)] for a in address]
+            targets = [_registry[strip_name(a)] for a in address]
         except KeyError as e:
-            logging.error(f'Available keys are: {list(__registry.keys())}')
+            logging.error(f'Available keys are: {list(_registry.keys())}')
             raise
         async for data in source:
-            await asyncio.gather(*[t.put(data) for t in targets])
+            for t in targets:
+                await t.put(data)
             yield data
     return _f
 
-
+def stats()->dict:
+    """Counters of all the registered :class:`Queue` objects"""
+    return {name:q.stats() for name,q in _registry.items() if isinstance(q, Queue)}
@@ -8,11 +8,12 @@ Wrapper around `pyzmq <https://github.com/zeromq/pyzmq>`_ module
 
 import asyncio
 import zmq.asyncio
+from .codecs import get_codec
 
 import logging
 logger = logging.getLogger(__name__)
 
-async def recv(address: str):
+async def recv(address: str, codec: str='pickle'):
     """
     Data :term:`source`.
     Receive data from zmq.PULL socket on given address.
@@ -22,20 +23,25 @@ async def recv(address: str):
         address: 
             socket address to *bind*, in format ``<protocol>/<address>:<port>``,
             for example ``tcp:/127.0.0.1:9000``
+        codec:
+            serialization codec: ``pickle``, ``msgpack`` or ``numpy`` (see :mod:`snap.elements.io.codecs`).
+            Must be the same as in the sender.
 
     Yields: 
         received message
     """
+    decode = get_codec(codec).decode
     with zmq.asyncio.Context() as ctx:
         with ctx.socket(zmq.PULL) as s:
             logger.info(f'Listen to address="{address}"')
             s.bind(address) 
             while True:
-                data = await s.recv_pyobj()
+                frames = await s.recv_multipart(copy=False)
+                data = decode([f.buffer for f in frames])
                 logger.debug(f'RECV:: "{data}"')
                 yield data
 
-def send(address: str):
+def send(address: str, codec: str='pickle'):
     """
     Processing  :term:`step`.
     Send data to given addresses via zmq.PUSH socket
@@ -44,13 +50,16 @@ def send(address: str):
         address: 
             socket address to *connect*, in format ``<protocol>/<address>:<port>``, 
             for example ``tcp:/127.0.0.1:9000``
+        codec:
+            serialization codec: ``pickle``, ``msgpack`` or ``numpy`` (see :mod:`snap.elements.io.codecs`)
     :Input:
-        data(any pickle-serializable object) to be sent
+        data(serializable with the given codec) to be sent
     :Output:
         data unchanged
     """ 
     if isinstance(address, str):
         address=[address]
+    encode = get_codec(codec).encode
     async def _f(source):
         #create the context
         with zmq.asyncio.Context() as ctx:
@@ -66,7 +75,8 @@ def send(address: str):
                 logger.debug('waiting for data to send...')
                 async for data in source:
                     logger.debug(f'SEND:: "{data}"')
-                    await asyncio.gather(*[s.send_pyobj(data) for s in socks])
+                    frames = encode(data)
+                    await asyncio.gather(*[s.send_multipart(frames, copy=False) for s in socks])
                     yield data
             finally:
                 #close sockets
@@ -50,25 +50,30 @@ class Node:
         finally:
             logger.info("Finished")
     
-    @classmethod
-    def from_yaml(cls, filename, nodename='node'):
+    @staticmethod
+    def read_cfg(filename, nodename='node')->NodeCfg:
         cfg = read_yaml(filename)
         try: 
-            node_cfg = cfg[nodename]
+            return cfg[nodename]
         except KeyError as e:
             all_nodes = list(cfg.keys())
             msg = f'No node="{nodename}" in config "{filename}".'+ \
             f'Available nodes are: {all_nodes}'
             logger.error(msg)
             raise KeyError(msg)
-        return cls.from_cfg(node_cfg)
 
     @classmethod
-    def from_cfg(cls, node_cfg:NodeCfg):
+    def from_yaml(cls, filename, nodename='node', **chain_opts):
+        return cls.from_cfg(cls.read_cfg(filename, nodename), **chain_opts)
+
+    @classmethod
+    def from_cfg(cls, node_cfg:NodeCfg, **chain_opts):
+        """Create the node from the configuration. 
+        Extra keyword arguments are passed to each :class:`snap.chain.Chain`"""
         #instantiate the python objects
         chains_built = [c.build() for c in node_cfg.chains]
         #subdivide the chains if needed
-        chains = [make_chains(c.elements, c.source, c.name) for c in chains_built]
+        chains = [make_chains(c.elements, c.source, c.name, **chain_opts) for c in chains_built]
         chains = [c for ch in chains for c in ch]
         #create the node
         return cls(name=node_cfg.name, chains=chains)
@@ -81,6 +86,14 @@ def get_parser():
             help='Node name (default="node")')
     parser.add_argument('-S','--status',metavar='ADDRESS',default=None,
             help='ZMQ socket address, where the reply server for status checks will bind. Default: no status server.')
+    parser.add_argument('--yield-every',metavar='N',type=int,default=0,
+            help='Give control to the other chains after every N items of each chain. Default: 0 (use --yield-interval)')
+    parser.add_argument('--yield-interval',metavar='SECONDS',type=float,default=1e-3,
+            help='Give control to the other chains after the given time of uninterrupted chain running. '
+                 '0 means relying only on the suspension points of the steps. Default: 0.001')
+    parser.add_argument('-j','--workers',metavar='N',type=int,default=1,
+            help='Distribute the chains of the node over N worker processes. '
+                 'Queues between the chains in different workers are replaced with zmq ipc sockets. Default: 1')
     parser.add_argument('-v','--verbose', metavar='LOG_LEVEL', choices=['CRITICAL','ERROR','WARNING','INFO','DEBUG'],
             help='Override the log level')
     return parser
@@ -90,7 +103,13 @@ def run():
     args = get_parser().parse_args()
     if args.verbose:
         logging.basicConfig(level=args.verbose)
-    node = Node.from_yaml(args.config, args.node)
+    chain_opts = dict(yield_every=args.yield_every,
+                      yield_interval=args.yield_interval)
+    if args.workers>1:
+        from snap.shard import run_sharded
+        sys.exit(run_sharded(args.config, args.node, args.workers, status=args.status, **chain_opts))
+
+    node = Node.from_yaml(args.config, args.node, **chain_opts)
 
     if args.status:
         node.add_status_server(args.status)
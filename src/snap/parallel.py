@@ -1,37 +1,180 @@
 from concurrent.futures import ThreadPoolExecutor,ProcessPoolExecutor
+from collections import deque
+import os
+from functools import partial
+from time import perf_counter
 import logging
 import asyncio
 logger = logging.getLogger(__name__)
 
+def _run_chunk(func, items):
+    """Run the function on each of the items. Returns the results and the time spent"""
+    t0 = perf_counter()
+    results = [func(d) for d in items]
+    return results, perf_counter()-t0
+
 class Parallel:
-    execs = { 
+    """
+    A :ref:`buffer` running the function on each data portion in a pool of threads or processes.
+
+    Args:
+        function
+            A function to run on each data portion. For ``executor='process'`` it must be picklable.
+        executor
+            ``'thread'`` or ``'process'``
+        max_workers
+            Maximal number of workers in the pool
+        max_inflight
+            Maximal number of data portions being processed or waiting to be taken from the buffer.
+            When this number is reached, putting new data waits, creating backpressure on the upstream chain.
+            If None - unlimited.
+        ordered
+            If True, the results are returned in the same order as the data was put.
+            Otherwise in the order of completion.
+        chunksize
+            Maximal number of data portions sent to a worker in one task.
+            Data portions are accumulated in a chunk only while all the workers are busy,
+            so this reduces the serialization/IPC overhead for the fast functions without adding latency.
+            If ``'auto'``, the chunk size is adjusted so that each task takes about *chunk_time* seconds,
+            based on the measured per-item processing time.
+        max_chunksize
+            Upper limit for the chunk size in ``'auto'`` mode.
+            The chunk size is also limited to :code:`max_inflight/(2*max_workers)`
+        chunk_time
+            Target duration (in seconds) of a task in ``'auto'`` mode
+        shared_memory
+            If True, the numpy arrays in the data portions (and in the results) are transferred
+            to the worker processes via shared memory blocks, instead of pickling them.
+            Each data portion in flight occupies one block, the number of blocks is *max_inflight* (or 2*max_workers).
+        slot_size
+            Size of each shared memory block, in bytes. The input and output arrays of one data portion should fit in it,
+            otherwise the arrays, which don't fit, are pickled.
+        shm_threshold
+            Arrays smaller than this size (in bytes) are pickled.
+    """
+    execs = {
              'thread': ThreadPoolExecutor,
              'process': ProcessPoolExecutor
-             }   
-    def __init__(self, function, executor='thread', max_workers=None):
+             }
+    def __init__(self, function, executor='thread', max_workers=None, max_inflight=None, ordered=False,
+                 chunksize=1, max_chunksize=1024, chunk_time=0.01,
+                 shared_memory=False, slot_size=16*2**20, shm_threshold=1024):
         self.func= function
+        self.shm = None
+        if shared_memory:
+            from snap import shm
+            n_slots = max_inflight or 2*(max_workers or os.cpu_count())
+            self.shm = shm.SharedArrayPool(n_slots, slot_size, shm_threshold)
+            function = partial(shm.call, function)
+        #the function running in the executor
+        self.call = function
         self.exe = self.execs[executor](max_workers=max_workers)
-        self.tasks = set()
-        self.results = []
-        self.has_tasks = asyncio.Event()
+        self.ordered = ordered
+        self.workers = self.exe._max_workers
+        self.max_inflight = max_inflight
+        self.auto_chunk = (chunksize=='auto')
+        self.max_chunksize = max_chunksize
+        self.chunk_time = chunk_time
+        self.item_time = None
+        #in 'auto' mode start from the largest chunks, until the processing time is measured
+        self.chunksize = self._limit_chunksize(max_chunksize) if self.auto_chunk else int(chunksize)
+        self.chunked = self.auto_chunk or self.chunksize>1
+        #current chunk, waiting for submission
+        self.pending = []
+        #number of the submitted, but not finished tasks
+        self.n_running = 0
+        #results of the last chunk, not yet taken
+        self.ready = deque()
+        self.slots = asyncio.Semaphore(max_inflight) if max_inflight else None
+        #futures, in the order of submission (if ordered) or completion
+        self.results = asyncio.Queue()
+        self.n_inflight = 0
+
     async def put(self, data):
-        t = asyncio.get_event_loop().run_in_executor(self.exe,
-                                                     self.func, 
-                                                     data)
-        self.tasks.add(t)
-        self.has_tasks.set()
-        logger.debug(f'Pending {len(self.tasks)} tasks: {self.tasks}')
+        if self.slots:
+            await self.slots.acquire()
+        self.n_inflight+=1
+        if self.shm:
+            data = await self.shm.put(data)
+        if self.chunked:
+            self.pending.append(data)
+            if self.n_running<self.workers or len(self.pending)>=self.chunksize:
+                self._submit_chunk()
+            return
+        t = asyncio.get_running_loop().run_in_executor(self.exe,
+                                                       self.call,
+                                                       data)
+        if self.ordered:
+            self.results.put_nowait(t)
+        else:
+            t.add_done_callback(self.results.put_nowait)
+        logger.debug(f'Pending {self.n_inflight} tasks')
+
+    def _release(self, n=1):
+        self.n_inflight-=n
+        if self.slots:
+            for i in range(n):
+                self.slots.release()
+
+    def _submit_chunk(self):
+        items, self.pending = self.pending, []
+        t = asyncio.get_running_loop().run_in_executor(self.exe,
+                                                       partial(_run_chunk, self.call),
+                                                       items)
+        self.n_running+=1
+        t.add_done_callback(partial(self._chunk_done, size=len(items)))
+        if self.ordered:
+            self.results.put_nowait((t, len(items)))
+
+    def _chunk_done(self, t, size):
+        self.n_running-=1
+        if not t.cancelled() and t.exception() is None:
+            self._update_chunksize(t.result()[1]/size)
+        if not self.ordered:
+            self.results.put_nowait((t, size))
+        if self.pending:
+            self._submit_chunk()
+
+    def _update_chunksize(self, item_time):
+        if not self.auto_chunk:
+            return
+        if self.item_time is None:
+            self.item_time = item_time
+        else:
+            self.item_time = 0.8*self.item_time + 0.2*item_time
+        n = self.chunk_time/self.item_time if self.item_time>0 else self.max_chunksize
+        self.chunksize = self._limit_chunksize(n)
+
+    def _limit_chunksize(self, n):
+        n = min(n, self.max_chunksize)
+        if self.max_inflight:
+            #keep enough chunks in flight to load all the workers
+            n = min(n, self.max_inflight//(2*self.workers))
+        return max(1, int(n))
+
     async def get(self):
-        while not self.results:
-            await self.has_tasks.wait()
-            logger.debug(f'waiting for results from {len(self.tasks)} task')
-            completed,pending = await asyncio.wait(self.tasks, 
-                                                   return_when=asyncio.FIRST_COMPLETED)
-            logger.debug(f'completed:{len(completed)}, pending: {len(pending)}')
-            self.results = [c.result() for c in completed]
-            self.tasks-=completed
-            if not self.tasks:
-                self.has_tasks.clear()
-
-        logger.debug(f'results:{self.results}')
-        return self.results.pop()
+        if self.chunked:
+            return await self._get_from_chunk()
+        t = await self.results.get()
+        try:
+            result = await t
+        finally:
+            self._release()
+        if self.shm:
+            result = self.shm.get(result)
+        return result
+
+    async def _get_from_chunk(self):
+        if not self.ready:
+            t, size = await self.results.get()
+            try:
+                results, dt = await t
+            except Exception:
+                self._release(size)
+                raise
+            self.ready.extend(results)
+        self._release()
+        result = self.ready.popleft()
+        if self.shm:
+            result = self.shm.get(result)
+        return result
@@ -0,0 +1,157 @@
+"""
+Running the chains of one node in several worker processes.
+
+The chains of the node are distributed over the workers (round-robin).
+Queue connections between the chains in different workers are replaced by the ZeroMQ ``ipc://`` sockets,
+so the data passed between such chains must be picklable.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os, re
+import shutil
+import signal
+import tempfile
+from dataclasses import replace
+
+from snap.config import ElementCfg, SourceCfg, NodeCfg, ChainCfg
+
+logger = logging.getLogger(__name__)
+
+_recv_names = ('.io.recv', '.io.queue.recv')
+_send_names = ('.io.send', '.io.queue.send')
+
+def _queue_name(address:str):
+    """Return the queue name, if the address is an in-process queue, otherwise None"""
+    if address.startswith('queue://'):
+        return address[len('queue://'):]
+    if '://' not in address:
+        return address
+    return None
+
+def _receiving_queue(chain:ChainCfg):
+    """Name of the queue, which the chain reads from (or None)"""
+    if chain.source is None:
+        return chain.name
+    if chain.source.name in _recv_names and chain.source.cfg:
+        return _queue_name(chain.source.cfg.get('address',''))
+    return None
+
+def _sending_queues(chain:ChainCfg):
+    """Names of the queues, which the chain sends to"""
+    queues = set()
+    for e in chain.elements:
+        if e.name in _send_names and e.cfg:
+            address = e.cfg.get('address',[])
+            if isinstance(address, str):
+                address = [address]
+            queues.update(q for q in map(_queue_name, address) if q)
+    return queues
+
+def ipc_address(ipc_dir:str, queue:str):
+    name = re.sub(r'[^\w.-]','_',queue)
+    return f'ipc://{ipc_dir}/{name}'
+
+def _element(name, cfg, mark):
+    e = ElementCfg(name, cfg)
+    e.mark = mark
+    return e
+
+def _rewrite_senders(chain:ChainCfg, remote:dict):
+    """Replace the queue targets in the send elements with the ipc addresses from *remote*"""
+    elements = []
+    for e in chain.elements:
+        if e.name not in _send_names or not e.cfg:
+            elements.append(e)
+            continue
+        address = e.cfg.get('address',[])
+        if isinstance(address, str):
+            address = [address]
+        local = [a for a in address if _queue_name(a) not in remote]
+        ipc = [remote[_queue_name(a)] for a in address if _queue_name(a) in remote]
+        if not ipc:
+            elements.append(e)
+            continue
+        if local:
+            elements.append(_element(e.name, {**e.cfg, 'address':local}, e.mark))
+        #queue options are not applicable to the zmq sender
+        elements.append(_element('.io.send', {'address':ipc}, e.mark))
+    return replace(chain, elements=elements)
+
+def shard(node_cfg:NodeCfg, n_workers:int, ipc_dir:str)->list[NodeCfg]:
+    """Split the node configuration into *n_workers* nodes.
+
+    Returns:
+        list of the node configurations, one per worker
+    """
+    chains = node_cfg.chains
+    n_workers = max(1, min(n_workers, len(chains)))
+    worker = {c.name:n%n_workers for n,c in enumerate(chains)}
+    #find the queues, connecting different workers
+    receivers = {}
+    for c in chains:
+        q = _receiving_queue(c)
+        if q is not None:
+            receivers[q] = c.name
+    remote = {}
+    for c in chains:
+        for q in _sending_queues(c):
+            if q in receivers and worker[receivers[q]]!=worker[c.name]:
+                remote[q] = ipc_address(ipc_dir, q)
+    logger.debug(f'Queues replaced by ipc: {remote}')
+    #rewrite the chains
+    nodes = [NodeCfg(name=f'{node_cfg.name}.{n}', chains=[]) for n in range(n_workers)]
+    for c in chains:
+        q = _receiving_queue(c)
+        if q in remote:
+            mark = c.source.mark if c.source else None
+            c = replace(c, source=_element(SourceCfg('.io.recv'), {'address':remote[q]}, mark))
+        c = _rewrite_senders(c, remote)
+        nodes[worker[c.name]].chains.append(c)
+    return nodes
+
+def _run_worker(filename, nodename, index, n_workers, ipc_dir, status, chain_opts):
+    from snap.node import Node
+    node_cfg = shard(Node.read_cfg(filename, nodename), n_workers, ipc_dir)[index]
+    logger.info(f'Worker {index}: chains {[c.name for c in node_cfg.chains]}')
+    node = Node.from_cfg(node_cfg, **chain_opts)
+    if status:
+        node.add_status_server(status)
+    asyncio.run(node.run())
+
+def run_sharded(filename:str, nodename:str, n_workers:int, status:str|None=None, **chain_opts):
+    """Run the node from the config file in *n_workers* processes.
+
+    Args:
+        status
+            address of the status server, which is added to the first worker
+    Returns:
+        exit code: 0 if all the workers finished successfully
+    """
+    from snap.node import Node
+    n_chains = len(Node.read_cfg(filename, nodename).chains)
+    n_workers = max(1, min(n_workers, n_chains))
+    ipc_dir = tempfile.mkdtemp(prefix='snap-')
+    procs = [multiprocessing.Process(target=_run_worker, name=f'{nodename}.{n}',
+                                     args=(filename, nodename, n, n_workers, ipc_dir,
+                                           status if n==0 else None, chain_opts))
+             for n in range(n_workers)]
+    def _forward(signum, frame):
+        for p in procs:
+            if p.is_alive():
+                os.kill(p.pid, signum)
+    for p in procs:
+        p.start()
+    logger.info(f'Started {n_workers} workers for node "{nodename}"')
+    handlers = {s:signal.signal(s, _forward) for s in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        for p in procs:
+            p.join()
+    finally:
+        for s,h in handlers.items():
+            signal.signal(s, h)
+        shutil.rmtree(ipc_dir, ignore_errors=True)
+    failed = [p.name for p in procs if p.exitcode]
+    if failed:
+        logger.error(f'Workers failed: {failed}')
+    return 1 if failed else 0
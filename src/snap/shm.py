@@ -0,0 +1,161 @@
+"""
+Transport of numpy arrays to the worker processes via shared memory.
+
+The parent process keeps a pool of shared memory blocks (slots).
+Each data portion sent to a worker gets its own slot: the arrays are copied into it,
+and only their descriptors (:class:`ArrayRef`) are pickled.
+The worker maps the arrays without copying, and puts the arrays of the result into the same slot, after the input data.
+"""
+import asyncio
+import weakref
+import logging
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_ALIGN = 64
+
+class ArrayRef:
+    """Descriptor of a numpy array in the shared memory slot"""
+    __slots__ = ('offset','shape','dtype')
+    def __init__(self, offset, shape, dtype):
+        self.offset = offset
+        self.shape = shape
+        self.dtype = dtype
+    def __getstate__(self):
+        return (self.offset, self.shape, self.dtype)
+    def __setstate__(self, state):
+        self.offset, self.shape, self.dtype = state
+    def __repr__(self):
+        return f'ArrayRef(offset={self.offset}, shape={self.shape}, dtype={self.dtype})'
+
+class _Error:
+    """Exception raised in the worker, transferred with the slot name"""
+    def __init__(self, exc):
+        self.exc = exc
+
+def encode(obj, buf, offset:int, threshold:int):
+    """Copy the numpy arrays from obj (recursively in dicts, lists and tuples) into the buffer, starting from *offset*.
+    Arrays smaller than *threshold* bytes, or not fitting in the buffer, are left in place.
+
+    Returns:
+        the object with arrays replaced by :class:`ArrayRef`, and the new offset
+    """
+    if isinstance(obj, np.ndarray):
+        if obj.nbytes<threshold or obj.dtype.hasobject:
+            return obj, offset
+        start = -(-offset//_ALIGN)*_ALIGN
+        if start+obj.nbytes > len(buf):
+            return obj, offset
+        dst = np.ndarray(obj.shape, obj.dtype, buffer=buf, offset=start)
+        dst[...] = obj
+        return ArrayRef(start, obj.shape, obj.dtype), start+obj.nbytes
+    elif isinstance(obj, dict):
+        res = {}
+        for key,val in obj.items():
+            res[key], offset = encode(val, buf, offset, threshold)
+        return res, offset
+    elif isinstance(obj, (list, tuple)):
+        res = []
+        for val in obj:
+            val, offset = encode(val, buf, offset, threshold)
+            res.append(val)
+        return type(obj)(res), offset
+    return obj, offset
+
+def decode(obj, buf, copy:bool=False):
+    """Replace :class:`ArrayRef` in the object with the arrays in the buffer (or their copies)"""
+    if isinstance(obj, ArrayRef):
+        a = np.ndarray(obj.shape, obj.dtype, buffer=buf, offset=obj.offset)
+        return a.copy() if copy else a
+    elif isinstance(obj, dict):
+        return {key:decode(val, buf, copy) for key,val in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return type(obj)(decode(val, buf, copy) for val in obj)
+    return obj
+
+#shared memory blocks, attached in this (worker) process
+_attached = {}
+
+def _attach(name):
+    shm = _attached.get(name)
+    if shm is None:
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            #python<3.13: the block is registered in the resource tracker, shared with the parent process
+            shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+def call(func, payload):
+    """Run the function in the worker process on the data from the shared memory slot"""
+    name, offset, threshold, data = payload
+    try:
+        buf = _attach(name).buf
+        result = func(decode(data, buf))
+        result, offset = encode(result, buf, offset, threshold)
+        return name, result
+    except Exception as e:
+        return name, _Error(e)
+
+def _close_blocks(blocks):
+    for b in blocks:
+        try:
+            b.close()
+            b.unlink()
+        except Exception as e:
+            logger.warning(f'Failed to release shared memory block {b.name}: {e}')
+
+class SharedArrayPool:
+    """A pool of shared memory slots for transferring the arrays to the worker processes
+
+    Args:
+        n_slots
+            Maximal number of slots. Sending more data portions waits until a slot is released.
+        slot_size
+            Size of each slot in bytes. It should fit the arrays of the input data and the result.
+        threshold
+            Arrays smaller than this size (in bytes) are pickled instead.
+    """
+    def __init__(self, n_slots:int, slot_size:int, threshold:int=1024):
+        #must be started before the worker processes, so that they share it
+        resource_tracker.ensure_running()
+        self.n_slots = n_slots
+        self.slot_size = slot_size
+        self.threshold = threshold
+        self.blocks = {}
+        self.free = asyncio.Queue()
+        self._created = []
+        self._finalizer = weakref.finalize(self, _close_blocks, self._created)
+
+    async def acquire(self):
+        if self.free.empty() and len(self.blocks)<self.n_slots:
+            b = shared_memory.SharedMemory(create=True, size=self.slot_size)
+            self.blocks[b.name] = b
+            self._created.append(b)
+            return b
+        return await self.free.get()
+
+    def release(self, name):
+        self.free.put_nowait(self.blocks[name])
+
+    async def put(self, data):
+        """Put the data to a free slot. Returns the payload for :func:`call`"""
+        b = await self.acquire()
+        data, offset = encode(data, b.buf, 0, self.threshold)
+        return b.name, offset, self.threshold, data
+
+    def get(self, ret):
+        """Copy the result, returned by :func:`call`, out of the slot and release the slot"""
+        name, result = ret
+        try:
+            if isinstance(result, _Error):
+                raise result.exc
+            return decode(result, self.blocks[name].buf, copy=True)
+        finally:
+            self.release(name)
+
+    def close(self):
+        self._finalizer()
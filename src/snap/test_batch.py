@@ -0,0 +1,56 @@
+from snap.batch import Batch, collect, vectorized
+from snap.chain import Chain, wrap
+from snap.elements import batch
+import asyncio
+import numpy as np
+import pytest
+
+async def source_from_array(data, delay=0):
+    for d in data:
+        yield d
+        await asyncio.sleep(delay)
+
+async def gather_all(source):
+    return [d async for d in source]
+
+@pytest.mark.asyncio
+async def test_collect_size():
+    res = await gather_all(collect(source_from_array(range(7)), size=3))
+    assert [b.items for b in res] == [[0,1,2],[3,4,5],[6]]
+
+@pytest.mark.asyncio
+async def test_collect_timeout():
+    async def slow_source():
+        yield 1
+        yield 2
+        await asyncio.sleep(0.1)
+        yield 3
+    res = await gather_all(collect(slow_source(), size=10, timeout=0.01))
+    assert [b.items for b in res] == [[1,2],[3]]
+
+@vectorized(stack=True)
+def double(x):
+    assert isinstance(x, np.ndarray)
+    return x*2
+
+@vectorized
+def drop_first(items):
+    return items[1:]
+
+def inc(d):
+    return d+1
+
+@pytest.mark.asyncio
+async def test_batched_chain():
+    seen = []
+    async def record(source):
+        async for d in source:
+            seen.append(d)
+            yield d
+
+    c = Chain('test', source_from_array(range(6)),
+              batch.collect(size=3), wrap(double), wrap(drop_first), wrap(inc), record)
+    c.build()
+    await gather_all(c.gen)
+    #each batch of 3 loses its first element
+    assert seen == [3,5,9,11]
@@ -0,0 +1,45 @@
+from snap.chain import Chain, wrap, step_name
+from snap.elements import output
+import pytest
+
+async def source_from_array(data):
+    for d in data:
+        yield d
+
+async def gather_all(source):
+    return [d async for d in source]
+
+def inc(d):
+    return d+1
+
+def fail_on_3(d):
+    if d==3:
+        raise ValueError(d)
+    return d
+
+async def positive(source):
+    async for d in source:
+        if d>0:
+            yield d
+
+def test_stages_are_fused():
+    c = Chain('test', None, wrap(inc), wrap(inc), positive, wrap(inc))
+    assert c.stages() == [[inc, inc], positive, [inc]]
+    c.fuse = False
+    assert c.stages() == [[inc], [inc], positive, [inc]]
+
+@pytest.mark.asyncio
+async def test_fused_chain():
+    c = Chain('test', source_from_array([-2,-1,0,1]), wrap(inc), wrap(inc), positive, wrap(inc))
+    c.build()
+    assert await gather_all(c.gen) == [2,3,4]
+
+@pytest.mark.asyncio
+async def test_fused_step_error():
+    c = Chain('test', source_from_array([1,2,3]), wrap(inc), wrap(fail_on_3), wrap(inc))
+    c.build()
+    with pytest.raises(RuntimeError, match='Failed in step snap.test_chain.fail_on_3'):
+        await gather_all(c.gen)
+
+def test_step_name():
+    assert step_name(wrap(output.dump())) == 'snap.elements.output.dump'
@@ -0,0 +1,79 @@
+from snap.parallel import Parallel
+import asyncio
+import time
+import pytest
+
+def sleep_and_return(d):
+    time.sleep(d)
+    return d
+
+@pytest.mark.asyncio
+async def test_ordered():
+    p = Parallel(sleep_and_return, max_workers=4, ordered=True)
+    data = [0.04, 0.03, 0.02, 0.01]
+    for d in data:
+        await p.put(d)
+    assert [await p.get() for d in data] == data
+
+@pytest.mark.asyncio
+async def test_unordered():
+    p = Parallel(sleep_and_return, max_workers=4)
+    data = [0.04, 0.03, 0.02, 0.01]
+    for d in data:
+        await p.put(d)
+    assert [await p.get() for d in data] == sorted(data)
+
+@pytest.mark.asyncio
+async def test_max_inflight():
+    p = Parallel(sleep_and_return, max_workers=4, max_inflight=2)
+    await p.put(0)
+    await p.put(0)
+    assert p.n_inflight == 2
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(p.put(0), timeout=0.05)
+    assert await p.get() == 0
+    await asyncio.wait_for(p.put(0), timeout=0.05)
+
+def square(d):
+    return d*d
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('executor',['thread','process'])
+@pytest.mark.parametrize('chunksize',[4,'auto'])
+async def test_chunked(executor, chunksize):
+    p = Parallel(square, executor=executor, max_workers=2, ordered=True, chunksize=chunksize)
+    data = list(range(100))
+    async def producer():
+        for d in data:
+            await p.put(d)
+    task = asyncio.create_task(producer())
+    assert [await p.get() for d in data] == [d*d for d in data]
+    await task
+    assert p.n_inflight == 0
+
+def scale_arrays(data):
+    if data['x'][0]<0:
+        raise ValueError('negative')
+    return {'x':data['x']*2, 'n':len(data['x'])}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('chunksize',[1,4])
+async def test_shared_memory(chunksize):
+    np = pytest.importorskip('numpy')
+    p = Parallel(scale_arrays, executor='process', max_workers=2, ordered=True,
+                 chunksize=chunksize, shared_memory=True, slot_size=2**16)
+    data = [{'x':np.arange(1000, dtype=float)+i} for i in range(10)]
+    async def producer():
+        for d in data:
+            await p.put(d)
+        await p.put({'x':-np.ones(1000)})
+    task = asyncio.create_task(producer())
+    for d in data:
+        res = await p.get()
+        assert res['n'] == 1000
+        assert np.array_equal(res['x'], d['x']*2)
+    with pytest.raises(ValueError):
+        await p.get()
+    await task
+    assert p.shm.free.qsize() == len(p.shm.blocks)
+    p.shm.close()
@@ -1,7 +1,9 @@
-from .queue import register, _registry, from_queue, to_queue
+from snap.elements.io.queue import register, _registry, recv, send, Queue
+import asyncio
 import pytest
 
 def test_register():
+    _registry.clear()
     n1 = register()
     n2 = register()
     n3 = register(name='test')
@@ -9,6 +11,7 @@ def test_register():
     assert n2=='Queue.01'
     assert n3=='test'
     assert list(_registry.keys())==[n1,n2,n3]
+    assert _registry[n1] is not _registry[n2]
 
 async def source_from_array(data):
     for d in data:
@@ -27,14 +30,44 @@ async def gather_all(source):
 async def test_put_get():
     name='test1'
     data = [1,2,3]
-    getter = from_queue(name)
-    putter = to_queue(name)
+    getter = recv(name)
+    putter = send([name])
     source = source_from_array(data)
     #put the data
     data1= await gather_all(putter(source))
     assert data1 == data
     print(data1)
-    
-    data2= await gather_all(getter())
+
+    data2= await gather_all(getter)
     assert data2 == data
     print(data2)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('policy,expected',[
+    ('drop_oldest', [3,4,5]),
+    ('drop_newest', [1,2,3]),
+    ('coalesce',    [1,2,5]),
+    ])
+async def test_overflow_policy(policy, expected):
+    q = Queue(maxsize=3, policy=policy)
+    for d in [1,2,3,4,5]:
+        await q.put(d)
+    assert [q.get_nowait() for n in range(q.qsize())] == expected
+    assert q.high_water == 3
+    assert q.dropped == 2
+
+@pytest.mark.asyncio
+async def test_block_policy():
+    q = Queue(maxsize=2)
+    await q.put(1)
+    await q.put(2)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(q.put(3), timeout=0.01)
+    assert q.dropped == 0
+
+def test_configure_from_send():
+    send(['test2'], maxsize=10, policy='drop_newest')
+    q = _registry['test2']
+    assert q.maxsize==10 and q.policy=='drop_newest'
+    with pytest.raises(ValueError):
+        q.configure(policy='unknown')
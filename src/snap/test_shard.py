@@ -0,0 +1,37 @@
+from snap.config import read_yaml
+from snap.shard import shard
+import pytest
+
+config = """
+node: !Node
+  - !chain:gen
+      - !from example.random: {}
+      - !to [a, b]
+  - !chain:a
+      - .output.dump: {}
+      - !to {address: b, maxsize: 10}
+  - !chain:b
+      - .output.dump: {}
+"""
+
+@pytest.fixture
+def node_cfg(tmp_path):
+    fname = tmp_path/'cfg.yml'
+    fname.write_text(config)
+    return read_yaml(fname)['node']
+
+def test_single_worker(node_cfg):
+    [node] = shard(node_cfg, 1, '/tmp/snap')
+    assert node.chains == node_cfg.chains
+
+def test_shard(node_cfg):
+    n0, n1 = shard(node_cfg, 2, '/tmp/snap')
+    assert [c.name for c in n0.chains] == ['gen', 'b']
+    assert [c.name for c in n1.chains] == ['a']
+    gen, b = n0.chains
+    [a] = n1.chains
+    #queue 'a' is in another worker, queue 'b' is local for 'gen', but remote for 'a'
+    assert [(e.name, e.cfg['address']) for e in gen.elements] == [('.io.send', ['ipc:///tmp/snap/a', 'ipc:///tmp/snap/b'])]
+    assert b.source.is_source and b.source.cfg == {'address':'ipc:///tmp/snap/b'}
+    assert a.source.is_source and a.source.cfg == {'address':'ipc:///tmp/snap/a'}
+    assert a.elements[-1].cfg == {'address':['ipc:///tmp/snap/b']}
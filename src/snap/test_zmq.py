@@ -0,0 +1,49 @@
+from snap.elements.io import zmq as zmq_io
+from snap.elements.io.codecs import get_codec
+import asyncio
+import numpy as np
+import pytest
+
+payloads = {
+    'pickle': {'x':np.arange(10000.), 'name':'test', 'n':[1,2,3]},
+    'numpy':  {'x':np.arange(10000.).reshape(100,100), 'y':np.ones(3, dtype=[('a','i4'),('b','f8')]), 'n':1},
+}
+
+def check_equal(a, b):
+    assert a.keys()==b.keys()
+    for key in a:
+        if isinstance(a[key], np.ndarray):
+            assert np.array_equal(a[key], b[key])
+        else:
+            assert a[key]==b[key]
+
+@pytest.mark.parametrize('codec', payloads)
+def test_codec_roundtrip(codec):
+    c = get_codec(codec)
+    data = payloads[codec]
+    frames = c.encode(data)
+    check_equal(c.decode([memoryview(f) for f in frames]), data)
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec('unknown')
+
+async def source_from_array(data):
+    for d in data:
+        yield d
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('codec', payloads)
+async def test_send_recv(tmp_path, codec):
+    address = f'ipc://{tmp_path}/test'
+    data = [payloads[codec]]*3
+    async def receive(n):
+        receiver = zmq_io.recv(address, codec=codec)
+        res = [await receiver.__anext__() for i in range(n)]
+        await receiver.aclose()
+        return res
+    task = asyncio.create_task(receive(len(data)))
+    sender = zmq_io.send(address, codec=codec)
+    sent = [d async for d in sender(source_from_array(data))]
+    for r,d in zip(await asyncio.wait_for(task, 1), data):
+        check_equal(r, d)